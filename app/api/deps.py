@@ -0,0 +1,12 @@
+from app.services.report_service import ReportService, report_service
+from app.services.risk_service import RiskAssessmentService, risk_service
+
+
+def get_risk_service() -> RiskAssessmentService:
+    """Shared RiskAssessmentService instance (overridable in tests)"""
+    return risk_service
+
+
+def get_report_service() -> ReportService:
+    """Shared ReportService instance (overridable in tests)"""
+    return report_service
@@ -1,15 +1,20 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from app.api.deps import get_risk_service
 from app.models.schemas import QuestionnaireRequest, QuestionnaireResponse, QuestionnaireStatus
 from app.services.risk_service import RiskAssessmentService
+import hashlib
 import logging
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
-risk_service = RiskAssessmentService()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 @router.post("/questionnaire/submit", response_model=QuestionnaireResponse)
-async def submit_questionnaire(request: QuestionnaireRequest):
+async def submit_questionnaire(
+    request: QuestionnaireRequest,
+    risk_service: RiskAssessmentService = Depends(get_risk_service)
+):
     """
     Submit a CSA questionnaire for risk assessment processing.
     
@@ -20,9 +25,11 @@ async def submit_questionnaire(request: QuestionnaireRequest):
     - submitted_at: Timestamp of submission
     """
     try:
-        # Process the questionnaire submission
-        processed_questionnaire = await risk_service.submit_questionnaire(request)
-        
+        # Persist the submission, then hand the LLM pipeline to the service's
+        # tracked background tasks so the handler only waits on the insert
+        processed_questionnaire = await risk_service.create_record(request)
+        risk_service.schedule_processing(processed_questionnaire.questionnaire_id)
+
         return QuestionnaireResponse(
             questionnaire_id=processed_questionnaire.questionnaire_id,
             status=processed_questionnaire.status,
@@ -31,14 +38,19 @@ async def submit_questionnaire(request: QuestionnaireRequest):
         )
         
     except Exception as e:
-        logger.error(f"Error submitting questionnaire: {e}")
+        logger.error("Error submitting questionnaire: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to submit questionnaire: {str(e)}"
         )
 
 @router.get("/questionnaire/{questionnaire_id}/status")
-async def get_questionnaire_status(questionnaire_id: str):
+async def get_questionnaire_status(
+    questionnaire_id: str,
+    request: Request,
+    response: Response,
+    risk_service: RiskAssessmentService = Depends(get_risk_service)
+):
     """
     Get the current processing status of a questionnaire.
     
@@ -49,26 +61,38 @@ async def get_questionnaire_status(questionnaire_id: str):
     - processed_at: When processing completed (if applicable)
     """
     try:
-        processed_questionnaire = await risk_service.get_report(questionnaire_id)
-        
-        if not processed_questionnaire:
+        status_doc = await risk_service.get_status(questionnaire_id)
+
+        if not status_doc:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Questionnaire with ID {questionnaire_id} not found"
             )
-        
+
+        # Pollers hit this endpoint repeatedly while processing runs: answer
+        # unchanged polls with an empty 304 instead of re-serializing the body
+        etag = hashlib.blake2b(
+            f"{status_doc['status']}:{status_doc.get('updated_at')}".encode(),
+            digest_size=8
+        ).hexdigest()
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED)
+        response.headers["ETag"] = etag
+        # Revalidate at the server instead of serving stale intermediate state
+        response.headers["Cache-Control"] = "no-cache"
+
         return {
-            "questionnaire_id": processed_questionnaire.questionnaire_id,
-            "status": processed_questionnaire.status,
-            "created_at": processed_questionnaire.created_at,
-            "processed_at": processed_questionnaire.processed_at,
-            "error_message": processed_questionnaire.error_message
+            "questionnaire_id": status_doc["questionnaire_id"],
+            "status": status_doc["status"],
+            "created_at": status_doc["created_at"],
+            "processed_at": status_doc.get("processed_at"),
+            "error_message": status_doc.get("error_message")
         }
-        
+
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting questionnaire status: {e}")
+        logger.error("Error getting questionnaire status: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get questionnaire status: {str(e)}"
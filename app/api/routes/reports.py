@@ -1,8 +1,15 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from app.models.schemas import (
-    ReportResponse, QuestionnaireStatus, AuditReportRegenerateRequest, 
-    AuditReportResponse
+    ReportResponse, QuestionnaireStatus, AuditReportRegenerateRequest,
+    AuditReportResponse, Risk, RiskRegister
 )
+import csv
+import io
+from typing import List
+from pydantic import TypeAdapter
+from app.api.deps import get_report_service, get_risk_service
+from app.database.redis_cache import cache_get, cache_set
 from app.services.risk_service import RiskAssessmentService
 from app.services.report_service import ReportService
 from datetime import datetime
@@ -10,12 +17,58 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
-risk_service = RiskAssessmentService()
-report_service = ReportService()
+# orjson serializes the deeply nested risk register models in C,
+# several times faster than the default json-based encoder
+router = APIRouter(default_response_class=ORJSONResponse)
+
+
+# Serialize export payloads through cached TypeAdapters: one model-walk
+# setup at import instead of a fresh metadata traversal per call, with the
+# element loop running in pydantic-core
+_risks_adapter = TypeAdapter(List[Risk])
+_register_adapter = TypeAdapter(RiskRegister)
+
+# Non-servable statuses mapped to (http_code, detail template): one dict
+# lookup on the poll-heavy report path instead of a chain of Enum compares
+_STATUS_HTTP = {
+    QuestionnaireStatus.SUBMITTED: (
+        status.HTTP_202_ACCEPTED,
+        "Questionnaire is still being processed. Please check back later."
+    ),
+    QuestionnaireStatus.IN_PROGRESS: (
+        status.HTTP_202_ACCEPTED,
+        "Risk assessment is currently in progress. Please check back later."
+    ),
+    QuestionnaireStatus.FAILED: (
+        status.HTTP_422_UNPROCESSABLE_ENTITY,
+        "Risk assessment processing failed: {err}"
+    ),
+}
+
+
+async def _iter_risks_csv(risk_register: RiskRegister):
+    """Yield CSV bytes for a risk register, one row at a time"""
+    fieldnames = list(Risk.model_fields.keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(fieldnames)
+    yield buffer.getvalue()
+
+    for row in _risks_adapter.dump_python(risk_register.risks, mode="json"):
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerow([
+            "; ".join(value) if isinstance(value, list) else value
+            for value in (row[name] for name in fieldnames)
+        ])
+        yield buffer.getvalue()
 
 @router.get("/reports/{questionnaire_id}", response_model=ReportResponse)
-async def get_complete_report(questionnaire_id: str):
+async def get_complete_report(
+    questionnaire_id: str,
+    risk_service: RiskAssessmentService = Depends(get_risk_service)
+):
     """
     Get the complete report for a questionnaire (risk register + audit report).
     
@@ -30,55 +83,55 @@ async def get_complete_report(questionnaire_id: str):
     
     Note: Audit reports are automatically generated after risk register completion.
     """
+    cache_key = f"report:{questionnaire_id}"
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        # Serve the already-serialized body: no Mongo round-trip, no Pydantic
+        return Response(content=cached, media_type="application/json")
+
     try:
-        processed_questionnaire = await risk_service.get_report(questionnaire_id)
-        
-        if not processed_questionnaire:
+        report_bundle = await risk_service.get_report_bundle(questionnaire_id)
+
+        if not report_bundle:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Questionnaire with ID {questionnaire_id} not found"
             )
-        
-        # Check if processing is still in progress
-        if processed_questionnaire.status == QuestionnaireStatus.SUBMITTED:
-            raise HTTPException(
-                status_code=status.HTTP_202_ACCEPTED,
-                detail="Questionnaire is still being processed. Please check back later."
-            )
-        
-        if processed_questionnaire.status == QuestionnaireStatus.IN_PROGRESS:
-            raise HTTPException(
-                status_code=status.HTTP_202_ACCEPTED,
-                detail="Risk assessment is currently in progress. Please check back later."
-            )
-            
-        if processed_questionnaire.status == QuestionnaireStatus.FAILED:
+
+        # Reject anything that is not servable yet with a single lookup
+        if report_bundle.status in _STATUS_HTTP:
+            status_code, detail = _STATUS_HTTP[report_bundle.status]
             raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=f"Risk assessment processing failed: {processed_questionnaire.error_message}"
+                status_code=status_code,
+                detail=detail.format(err=report_bundle.error_message or "")
             )
-        
-        return ReportResponse(
-            questionnaire_id=processed_questionnaire.questionnaire_id,
-            status=processed_questionnaire.status,
-            risk_register=processed_questionnaire.risk_register,
-            audit_report=processed_questionnaire.audit_report,
-            created_at=processed_questionnaire.created_at,
-            processed_at=processed_questionnaire.processed_at,
-            error_message=processed_questionnaire.error_message
-        )
-        
+
+        # Only COMPLETED reaches this point (everything else raised above),
+        # and COMPLETED payloads are immutable - cache without expiry; the
+        # processing worker invalidates on reprocessing. In-progress 202
+        # responses are intentionally never cached, and a COMPLETED body
+        # with no register (only possible mid-worker-race) is served but
+        # never pinned in the no-expiry cache.
+        body = report_bundle.model_dump_json().encode()
+        if report_bundle.risk_register is not None:
+            await cache_set(cache_key, body)
+        return Response(content=body, media_type="application/json")
+
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting risk register report: {e}")
+        logger.error("Error getting risk register report: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get risk register report: {str(e)}"
         )
 
 @router.get("/reports/{questionnaire_id}/export")
-async def export_risk_register(questionnaire_id: str, format: str = "json"):
+async def export_risk_register(
+    questionnaire_id: str,
+    format: str = "json",
+    risk_service: RiskAssessmentService = Depends(get_risk_service)
+):
     """
     Export risk register in different formats.
     
@@ -108,22 +161,25 @@ async def export_risk_register(questionnaire_id: str, format: str = "json"):
             return {
                 "questionnaire_id": questionnaire_id,
                 "export_format": "json",
-                "data": processed_questionnaire.risk_register.model_dump() if processed_questionnaire.risk_register else None
+                "data": _register_adapter.dump_python(processed_questionnaire.risk_register, mode="json") if processed_questionnaire.risk_register else None
             }
         elif format.lower() == "csv":
-            # For CSV export, we would typically return the data in a format suitable for CSV conversion
-            # This is a simplified version - in production you might want to use pandas or similar
             if not processed_questionnaire.risk_register:
                 raise HTTPException(
                     status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                     detail="No risk data available for export"
                 )
-            
-            return {
-                "questionnaire_id": questionnaire_id,
-                "export_format": "csv",
-                "data": [risk.model_dump() for risk in processed_questionnaire.risk_register.risks]
-            }
+
+            # Stream real CSV rows instead of buffering the whole register:
+            # peak memory stays at one row and the client starts receiving
+            # bytes before the last row is formatted
+            return StreamingResponse(
+                _iter_risks_csv(processed_questionnaire.risk_register),
+                media_type="text/csv",
+                headers={
+                    "Content-Disposition": f"attachment; filename=risks_{questionnaire_id}.csv"
+                }
+            )
         else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -133,7 +189,7 @@ async def export_risk_register(questionnaire_id: str, format: str = "json"):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error exporting risk register: {e}")
+        logger.error("Error exporting risk register: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to export risk register: {str(e)}"
@@ -215,7 +271,10 @@ async def export_risk_register(questionnaire_id: str, format: str = "json"):
 #         )
 
 @router.get("/reports/{questionnaire_id}/audit-report", response_model=AuditReportResponse)
-async def get_audit_report(questionnaire_id: str):
+async def get_audit_report(
+    questionnaire_id: str,
+    report_service: ReportService = Depends(get_report_service)
+):
     """
     Retrieve an existing audit report.
     
@@ -225,27 +284,27 @@ async def get_audit_report(questionnaire_id: str):
     Returns:
     - Previously generated audit report or 404 if not found
     """
+    cache_key = f"audit_report:{questionnaire_id}"
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
     try:
-        # Get the complete questionnaire with audit report
-        processed_questionnaire = await report_service.get_processed_questionnaire_with_report(
-            questionnaire_id
-        )
-        
-        if not processed_questionnaire:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Questionnaire with ID {questionnaire_id} not found"
-            )
-        
-        if not processed_questionnaire.audit_report:
+        # Fetch only the audit_report sub-document (narrow projection)
+        audit_report = await report_service.get_audit_report(questionnaire_id)
+
+        if not audit_report:
+            if not await report_service.questionnaire_exists(questionnaire_id):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Questionnaire with ID {questionnaire_id} not found"
+                )
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"No audit report found for questionnaire {questionnaire_id}. Generate one first using POST endpoint."
             )
-        
-        audit_report = processed_questionnaire.audit_report
-        
-        return AuditReportResponse(
+
+        response = AuditReportResponse(
             questionnaire_id=questionnaire_id,
             status="completed",
             report=audit_report.report_sections,
@@ -254,11 +313,16 @@ async def get_audit_report(questionnaire_id: str):
             generated_at=audit_report.generated_at,
             message="Audit report retrieved successfully"
         )
-        
+
+        # Audit reports are immutable once generated - cache without expiry
+        body = response.model_dump_json().encode()
+        await cache_set(cache_key, body)
+        return Response(content=body, media_type="application/json")
+
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error retrieving audit report: {e}")
+        logger.error("Error retrieving audit report: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve audit report: {str(e)}"
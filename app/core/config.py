@@ -9,15 +9,35 @@ class Settings(BaseSettings):
     # MongoDB settings
     mongodb_url: str = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
     database_name: str = os.getenv("DATABASE_NAME", "risk_assessment")
+    mongo_max_pool_size: int = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+    mongo_min_pool_size: int = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+    mongo_socket_timeout_ms: int = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000"))
     
     # Omni server settings
     omni_base_url: str = os.getenv("OMNI_BASE_URL", "http://localhost:10240/v1")
     omni_api_key: str = os.getenv("OMNI_API_KEY", "mlx-omni-server")
     omni_model: str = os.getenv("OMNI_MODEL", "Qwen3-4B-8bit")
+    llm_concurrency: int = int(os.getenv("LLM_CONCURRENCY", "4"))
+
+    # Content-addressed audit-report cache (skips the LLM on identical input)
+    report_cache_enabled: bool = os.getenv("REPORT_CACHE_ENABLED", "true").lower() == "true"
+    report_cache_ttl_seconds: int = int(os.getenv("REPORT_CACHE_TTL_SECONDS", str(30 * 86400)))
     
+    # Redis response cache settings
+    redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
     # API settings
     api_host: str = os.getenv("API_HOST", "0.0.0.0")
     api_port: int = int(os.getenv("API_PORT", "8000"))
+
+    # Explicit CORS origins (comma-separated): '*' with credentials is
+    # invalid anyway and forces Starlette to echo the Origin per request,
+    # while a concrete list gets the O(1) allow-list fast path. Kept as a
+    # plain string - a List[str] field would make pydantic-settings try to
+    # JSON-decode the raw env value and crash on the comma-separated format
+    cors_origins: str = os.getenv(
+        "CORS_ORIGINS", "http://localhost:3000,http://localhost:8000"
+    )
     
     class Config:
         env_file = ".env"
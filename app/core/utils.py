@@ -0,0 +1,10 @@
+from datetime import datetime, timezone
+
+
+def utc_now() -> datetime:
+    """Current UTC time for document timestamps.
+
+    One shared implementation so every timestamp in the service is produced
+    (and can be tuned or faked) in a single place.
+    """
+    return datetime.now(timezone.utc)
@@ -18,9 +18,11 @@ async def connect_to_mongo():
             settings.mongodb_url,
             serverSelectionTimeoutMS=5000,  # 5 second timeout
             connectTimeoutMS=5000,          # 5 second connection timeout
-            socketTimeoutMS=5000,           # 5 second socket timeout
-            maxPoolSize=10,                 # Maximum connection pool size
-            minPoolSize=1,                  # Minimum connection pool size
+            socketTimeoutMS=settings.mongo_socket_timeout_ms,
+            maxPoolSize=settings.mongo_max_pool_size,
+            minPoolSize=settings.mongo_min_pool_size,
+            compressors="zstd",             # shrink large questionnaire documents on the wire
+            retryReads=True,
         )
         mongo_db.database = mongo_db.client[settings.database_name]
         
@@ -28,8 +30,23 @@ async def connect_to_mongo():
         await mongo_db.client.admin.command('ping')
         logger.info(f"Connected to MongoDB at {settings.mongodb_url}")
         
-        # Create indexes for better performance
+        # Create indexes for better performance. Status polls are an
+        # equality lookup on questionnaire_id - the unique index below
+        # serves them; the projection in get_status pulls fields (created_at,
+        # updated_at, error_message) that no reasonable index would cover,
+        # so there is no covering index to build for that path.
         await mongo_db.database.questionnaires.create_index("questionnaire_id", unique=True)
+        # Auto-evict failed questionnaires after a week
+        await mongo_db.database.questionnaires.create_index(
+            "created_at",
+            expireAfterSeconds=7 * 86400,
+            partialFilterExpression={"status": "failed"}
+        )
+        # Bound the content-addressed audit-report cache
+        await mongo_db.database.report_cache.create_index(
+            "created_at",
+            expireAfterSeconds=settings.report_cache_ttl_seconds
+        )
         logger.info("Created database indexes")
         
     except Exception as e:
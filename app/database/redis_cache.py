@@ -0,0 +1,62 @@
+from typing import Optional
+
+from redis import asyncio as aioredis
+
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RedisCache:
+    client: aioredis.Redis = None
+
+redis_cache = RedisCache()
+
+async def connect_to_redis():
+    """Create Redis connection for the response cache (optional dependency)"""
+    try:
+        redis_cache.client = aioredis.from_url(
+            settings.redis_url,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+        )
+        await redis_cache.client.ping()
+        logger.info(f"Connected to Redis at {settings.redis_url}")
+    except Exception as e:
+        # The cache is a pure optimization - run without it if Redis is down
+        logger.warning(f"Could not connect to Redis, response caching disabled: {e}")
+        redis_cache.client = None
+
+async def close_redis_connection():
+    """Close Redis connection"""
+    if redis_cache.client:
+        await redis_cache.client.aclose()
+        logger.info("Disconnected from Redis")
+
+async def cache_get(key: str) -> Optional[bytes]:
+    """Get a cached response body, or None on miss / cache unavailable"""
+    if redis_cache.client is None:
+        return None
+    try:
+        return await redis_cache.client.get(key)
+    except Exception as e:
+        logger.warning(f"Redis GET failed for {key}: {e}")
+        return None
+
+async def cache_set(key: str, body: bytes, ttl: Optional[int] = None):
+    """Store a serialized response body; ttl=None means no expiry"""
+    if redis_cache.client is None:
+        return
+    try:
+        await redis_cache.client.set(key, body, ex=ttl)
+    except Exception as e:
+        logger.warning(f"Redis SET failed for {key}: {e}")
+
+async def cache_delete(*keys: str):
+    """Invalidate cached response bodies (used by the processing worker)"""
+    if redis_cache.client is None or not keys:
+        return
+    try:
+        await redis_cache.client.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Redis DELETE failed for {keys}: {e}")
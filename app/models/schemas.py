@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Literal, Annotated
 from datetime import datetime
 from enum import Enum
@@ -179,6 +179,10 @@ class RiskLLMInputRegister(BaseModel):
 
 
 class Risk(BaseModel):
+    model_config = ConfigDict(
+        frozen=True, extra="forbid", populate_by_name=True, use_enum_values=True
+    )
+
     Function: Literal[
         "Accounting & Billing", "Budgeting", "Procurement", "All"
     ] = Field(..., description="Select the business function this risk belongs to. Must match one of the predefined categories in the risk register.")
@@ -298,6 +302,10 @@ class Risk(BaseModel):
     )
 
 class RiskRegister(BaseModel):
+    model_config = ConfigDict(
+        frozen=True, extra="forbid", populate_by_name=True, use_enum_values=True
+    )
+
     risks: List[Risk] = Field(
         ..., description="List of all risks captured from CSA questionnaire."
     )
@@ -306,6 +314,42 @@ class RiskRegister(BaseModel):
 
 class AuditReportSections(BaseModel):
     """Audit report sections based on report.py structure"""
+    model_config = ConfigDict(
+        frozen=True, extra="forbid", populate_by_name=True, use_enum_values=True
+    )
+
+    executive_summary: str = Field(
+        ...,
+        description=(
+            "A detailed, high-level overview of the audit. Summarize the department audited, "
+            "the company name, the main objectives of the audit, and the most critical findings. "
+            "Provide overall risk posture in plain language (e.g., high, medium, low). "
+            "This should help leadership quickly grasp the key risks and overall situation."
+        ),
+    )
+    risk_overview: str = Field(
+        ...,
+        description=(
+            "Bullet-point style summary of the identified risks. Include details such as: "
+            "- number of risks identified, "
+            "- how many are critical/high/medium/low, "
+            "- their categories (e.g., compliance, operational, financial), and "
+            "- any significant root causes. "
+            "This should act as a quick scan of risk exposure."
+        ),
+    )
+    recommendations: List[str] = Field(
+        ...,
+        description=(
+            "A prioritized list of actionable recommendations tailored to the company and department. "
+            "Each item should clearly address the risks and weaknesses identified in the audit. "
+            "Recommendations should be practical, implementable, and focused on improving internal controls, "
+            "compliance, and process efficiency."
+        ),
+    )
+
+class AuditExecutiveSummary(BaseModel):
+    """Standalone executive_summary section for parallel report generation"""
     executive_summary: str = Field(
         ...,
         description=(
@@ -315,6 +359,9 @@ class AuditReportSections(BaseModel):
             "This should help leadership quickly grasp the key risks and overall situation."
         ),
     )
+
+class AuditRiskOverview(BaseModel):
+    """Standalone risk_overview section for parallel report generation"""
     risk_overview: str = Field(
         ...,
         description=(
@@ -326,6 +373,9 @@ class AuditReportSections(BaseModel):
             "This should act as a quick scan of risk exposure."
         ),
     )
+
+class AuditRecommendations(BaseModel):
+    """Standalone recommendations section for parallel report generation"""
     recommendations: List[str] = Field(
         ...,
         description=(
@@ -338,6 +388,10 @@ class AuditReportSections(BaseModel):
 
 class AuditReport(BaseModel):
     """Complete audit report with metadata"""
+    model_config = ConfigDict(
+        frozen=True, extra="forbid", populate_by_name=True, use_enum_values=True
+    )
+
     questionnaire_id: str
     company_name: Optional[str] = None
     department_name: Optional[str] = None
@@ -347,6 +401,10 @@ class AuditReport(BaseModel):
 
 class ProcessedQuestionnaire(BaseModel):
     """Complete processed questionnaire document"""
+    model_config = ConfigDict(
+        frozen=True, extra="forbid", populate_by_name=True, use_enum_values=True
+    )
+
     questionnaire_id: str
     original_data: str
     risk_register: Optional[RiskRegister] = None
@@ -1,20 +1,107 @@
+import asyncio
+import functools
 import logging
-from typing import Optional, Type
-from openai import AsyncOpenAI
+import random
+from typing import List, Optional, Tuple, Type
+import fastjsonschema
+import httpx
+import orjson
+from openai import (
+    APIConnectionError, APITimeoutError, AsyncOpenAI,
+    AuthenticationError, BadRequestError, RateLimitError
+)
 from pydantic import BaseModel
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Transient upstream conditions worth retrying; anything else either
+# cannot succeed on retry (bad request, bad credentials) or is a local
+# bug (schema validation), so retrying would just hammer the server
+RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, RateLimitError, asyncio.TimeoutError)
+
+# Hard cap per attempt so a hung LLM call cannot hold a worker forever
+REQUEST_TIMEOUT_SECONDS = 30.0
+
+
+@functools.lru_cache(maxsize=32)
+def _schema_for(schema: Type[BaseModel]) -> dict:
+    """JSON Schema for a Pydantic model, computed once per model class.
+
+    The SDK would otherwise re-walk the deeply nested register models on
+    every request to build the same schema dict.
+    """
+    return schema.model_json_schema()
+
+
+@functools.lru_cache(maxsize=32)
+def _validator_for(schema: Type[BaseModel]):
+    """Compiled fastjsonschema validator, one per model class.
+
+    A cheap structural pre-filter: malformed LLM output is rejected in
+    microseconds instead of going through Pydantic's (much slower)
+    error-collection machinery.
+    """
+    return fastjsonschema.compile(_schema_for(schema))
+
 class LLMService:
-    """Service for interacting with the Omni LLM server"""
+    """Service for interacting with the Omni LLM server.
+
+    Process-wide singleton: every consumer shares one AsyncOpenAI client
+    backed by one pooled httpx client, so concurrent LLM calls reuse
+    keep-alive connections instead of re-handshaking per service instance.
+    """
+
+    _instance: Optional["LLMService"] = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
 
     def __init__(self):
+        if getattr(self, "_initialized", False):
+            return
         self.model = settings.omni_model
         self.base_url = settings.omni_base_url
         self.api_key = settings.omni_api_key
-        self.client = AsyncOpenAI(base_url=self.base_url, api_key=self.api_key)
-        logger.info(f"LLM Service initialized with model: {self.model} on {self.base_url}")
+        self.http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=50,
+                keepalive_expiry=60,
+            ),
+        )
+        self.client = AsyncOpenAI(
+            base_url=self.base_url,
+            api_key=self.api_key,
+            http_client=self.http_client,
+        )
+        self._initialized = True
+        logger.info("LLM Service initialized with model: %s on %s", self.model, self.base_url)
+
+    async def aclose(self):
+        """Close the shared HTTP connection pool (called at app shutdown)"""
+        await self.http_client.aclose()
+
+    async def parse_batch(
+        self,
+        requests: List[Tuple[Type[BaseModel], str, str]],
+    ) -> List[Optional[BaseModel]]:
+        """Dispatch several structured-output calls concurrently.
+
+        Each entry is a (schema, system_prompt, user_prompt) triple; results
+        come back in the same order, None for any call that failed. The calls
+        share the pooled HTTP client, so wall-clock latency is the max of the
+        individual round-trips rather than their sum.
+        """
+        return await asyncio.gather(
+            *(
+                self.parse_response(schema, system_prompt, user_prompt)
+                for schema, system_prompt, user_prompt in requests
+            )
+        )
 
     async def parse_response(
         self,
@@ -22,26 +109,60 @@ class LLMService:
         system_prompt: str,
         user_prompt: str,
         max_retries: int = 3,
+        messages: Optional[list] = None,
     ) -> Optional[BaseModel]:
-        """Generate a structured response validated by a Pydantic schema"""
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
+        """Generate a structured response validated by a Pydantic schema.
+
+        Callers on the hot path can pass a pre-built `messages` list to skip
+        reassembling the same dicts on every invocation.
+        """
+        if messages is None:
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ]
 
         for attempt in range(max_retries):
             try:
-                response = await self.client.beta.chat.completions.parse(
-                    model=self.model,
-                    messages=messages,
-                    response_format=schema,
+                response = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        response_format={
+                            "type": "json_schema",
+                            "json_schema": {
+                                "name": schema.__name__,
+                                "schema": _schema_for(schema),
+                                "strict": True,
+                            },
+                        },
+                    ),
+                    timeout=REQUEST_TIMEOUT_SECONDS,
                 )
-                return response.choices[0].message.parsed
+                # Structural pre-filter first, then Pydantic for the typed
+                # tree (model_construct is not enough here - nested models
+                # need real hydration)
+                data = orjson.loads(response.choices[0].message.content)
+                _validator_for(schema)(data)
+                return schema.model_validate(data)
 
-            except Exception as e:
-                logger.error(f"LLM JSON parse failed on attempt {attempt + 1}: {e}")
+            except (BadRequestError, AuthenticationError):
+                # Non-retryable: the request itself is wrong, fail fast
+                raise
+
+            except RETRYABLE_ERRORS as e:
+                logger.error("LLM request failed on attempt %d: %s", attempt + 1, e)
                 if attempt == max_retries - 1:
-                    logger.error(f"Failed to parse response after {max_retries} attempts")
+                    logger.error("Failed to get response after %d attempts", max_retries)
                     return None
+                # Exponential backoff with jitter so retries give the Omni
+                # server room to recover instead of hammering it
+                await asyncio.sleep(min(2 ** attempt, 8) + random.random() * 0.5)
+
+            except Exception as e:
+                # Schema-validation and other local failures will not get
+                # better on retry - give up immediately
+                logger.error("LLM JSON parse failed: %s", e)
+                return None
 
         return None
@@ -1,22 +1,122 @@
+import hashlib
 import logging
-from datetime import datetime, timezone
+import sys
+from functools import cached_property
+from collections import Counter
 from typing import Optional
 
+import orjson
+
 from app.models.schemas import (
-    AuditReportSections, AuditReport, ProcessedQuestionnaire, 
+    AuditExecutiveSummary, AuditRecommendations, AuditReportSections,
+    AuditReport, AuditRiskOverview, ProcessedQuestionnaire,
     QuestionnaireStatus, RiskRegister
 )
+from app.core.config import settings
 from app.services.llm_service import LLMService
+from app.core.utils import utc_now
 from app.database.mongodb import get_database
 
 logger = logging.getLogger(__name__)
 
-class ReportService:
-    """Service for generating audit reports from risk registers"""
-    
-    def __init__(self):
-        self.llm_service = LLMService()
-        self.system_prompt = """You are a risk assessment and internal audit reporting agent.
+# Narrow projection for the audit-report read path: skips decoding the
+# (potentially very large) risk_register and original_data fields entirely.
+AUDIT_REPORT_PROJECTION = {
+    "audit_report": 1,
+    "status": 1,
+    "company_name": 1,
+    "department": 1,
+    "questionnaire_id": 1,
+    "_id": 0,
+}
+
+def _fast_dump(model) -> dict:
+    """Dump a Pydantic model to built-in types through its Rust JSON path.
+
+    model_dump_json serializes in pydantic-core and orjson parses the bytes
+    back in C - several times faster than the pure-Python model_dump walker
+    on nested models. Datetime fields come back as ISO strings, so callers
+    that want real BSON dates must reattach them.
+    """
+    return orjson.loads(model.model_dump_json())
+
+
+def inflate_risk_register(document: dict) -> dict:
+    """Rehydrate the risk register stored as a JSON string blob.
+
+    The worker writes risk_register_json (one pre-serialized string) instead
+    of a nested BSON sub-document, so reads skip the BSON-to-dict decode of
+    every leaf field and parse the blob in one pass with pydantic-core.
+    Documents written before this format (or seeded with a plain
+    risk_register) pass through untouched.
+    """
+    raw = document.pop("risk_register_json", None)
+    if raw is not None and document.get("risk_register") is None:
+        document["risk_register"] = RiskRegister.model_validate_json(raw)
+    return document
+
+
+def hydrate_audit_report(audit: dict) -> AuditReport:
+    """Rebuild an AuditReport from its stored sub-document without validators"""
+    sections = audit.get("report_sections")
+    return AuditReport.model_construct(**{
+        **audit,
+        "report_sections": AuditReportSections.model_construct(**sections) if sections else None,
+    })
+
+
+def hydrate_processed_questionnaire(document: dict) -> ProcessedQuestionnaire:
+    """Hydrate a trusted Mongo document without re-running validators.
+
+    Everything in the questionnaires collection was written by this service,
+    so the nested tree is rebuilt with model_construct - no per-field
+    validation. The risk register blob still goes through
+    model_validate_json, which is already a single Rust pass. Full
+    validation stays at the user-input and LLM boundaries.
+    """
+    inflate_risk_register(document)
+    register = document.get("risk_register")
+    if isinstance(register, dict):
+        # Legacy document with the register as a plain sub-document
+        document["risk_register"] = RiskRegister.model_validate(register)
+    audit = document.get("audit_report")
+    if isinstance(audit, dict):
+        document["audit_report"] = hydrate_audit_report(audit)
+    return ProcessedQuestionnaire.model_construct(**document)
+
+
+def _summarize_register(risk_register: RiskRegister) -> str:
+    """Aggregate likelihood/impact/category counts in one pass.
+
+    Gives the LLM exact figures for the risk_overview section instead of
+    making it count risks itself. Counter tallies in C; registers are tens
+    of risks, far below the size where a JIT-compiled kernel would pay for
+    its dispatch overhead.
+    """
+    likelihood = Counter()
+    impact = Counter()
+    category = Counter()
+    for risk in risk_register.risks:
+        if risk.Risk_Likelihood:
+            likelihood[risk.Risk_Likelihood] += 1
+        if risk.Risk_Impact:
+            impact[risk.Risk_Impact] += 1
+        category[risk.Risk_Category] += 1
+
+    def fmt(counter: Counter) -> str:
+        return ", ".join(f"{name}: {count}" for name, count in counter.most_common()) or "not rated"
+
+    return (
+        f"Total risks: {len(risk_register.risks)}\n"
+        f"By likelihood: {fmt(likelihood)}\n"
+        f"By impact: {fmt(impact)}\n"
+        f"By category: {fmt(category)}"
+    )
+
+
+# Invariant prompt built once at import: no per-call string allocation, and
+# a byte-identical prefix across calls
+REPORT_SYSTEM_PROMPT = sys.intern("""You are a risk assessment and internal audit reporting agent.
 You will be given a Risk Register and audit context.
 
 Your job is to generate a structured Internal Audit Report in JSON format following the given schema.
@@ -29,63 +129,165 @@ Guidelines:
 5. Recommendations should be specific, practical, and clearly address the risks noted.
 
 Return only valid JSON that matches the schema exactly.
+""")
+
+# Per-section prompts for the parallel generation path: the three sections
+# share the same register input but have no data dependency on each other
+_SECTION_PROMPT_PREFIX = """You are a risk assessment and internal audit reporting agent.
+You will be given a Risk Register and audit context.
+
+Your job is to generate one section of a structured Internal Audit Report in JSON format following the given schema.
+Do not invent or add fields outside the schema.
+Return only valid JSON that matches the schema exactly.
+
 """
 
-    async def generate_audit_report(self, questionnaire_id: str, company_name: str, department_name: Optional[str] = None, force_regenerate: bool = False) -> Optional[AuditReportSections]:
-        """Generate audit report from existing risk register"""
-        
+EXECUTIVE_SUMMARY_PROMPT = sys.intern(_SECTION_PROMPT_PREFIX +
+    "Generate the executive_summary: a detailed high-level overview that "
+    "incorporates the company name and department name, the audit objectives, "
+    "the most critical findings and the overall risk posture.")
+
+RISK_OVERVIEW_PROMPT = sys.intern(_SECTION_PROMPT_PREFIX +
+    "Generate the risk_overview: a clear, structured summary of the "
+    "identified risks with focus on counts, criticality, categories and "
+    "significant root causes.")
+
+RECOMMENDATIONS_PROMPT = sys.intern(_SECTION_PROMPT_PREFIX +
+    "Generate the recommendations: a prioritized list of specific, practical "
+    "actions that clearly address the risks noted.")
+
+class ReportService:
+    """Service for generating audit reports from risk registers"""
+
+    def __init__(self):
+        self.llm_service = LLMService()
+
+    @cached_property
+    def db(self):
+        """Database handle, resolved on first use and then a plain attribute read"""
+        return get_database()
+
+    async def generate_audit_report(self, questionnaire_id: str, company_name: str, department_name: Optional[str] = None, force_regenerate: bool = False, risk_register: Optional[RiskRegister] = None) -> Optional[AuditReportSections]:
+        """Generate audit report from a risk register.
+
+        The worker passes the freshly built risk_register directly so this
+        runs straight to the LLM without re-reading the document it just
+        wrote; without one, the register is fetched from Mongo.
+        """
+
         try:
-            # Get the processed questionnaire with risk register
-            db = get_database()
-            document = await db.questionnaires.find_one(
-                {"questionnaire_id": questionnaire_id}
-            )
-            
-            if not document:
-                logger.error(f"Questionnaire {questionnaire_id} not found")
-                return None
-            
-            processed_questionnaire = ProcessedQuestionnaire(**document)
-            
-            # Check if audit report already exists and we don't want to force regenerate
-            if (processed_questionnaire.audit_report and 
-                processed_questionnaire.audit_report.report_sections and 
-                not force_regenerate):
-                logger.info(f"Audit report already exists for questionnaire {questionnaire_id}")
-                return processed_questionnaire.audit_report.report_sections
-            
-            # Check if risk register is available
-            if not processed_questionnaire.risk_register:
-                logger.error(f"Risk register not available for questionnaire {questionnaire_id}")
-                return None
-            
-            # Use stored company and department info from the questionnaire
-            stored_company = processed_questionnaire.company_name or company_name
-            stored_department = processed_questionnaire.department or department_name
-            
-            # Prepare the prompt for report generation
-            risk_data = {
-                "risks": [risk.model_dump() for risk in processed_questionnaire.risk_register.risks]
-            }
-            
+            if risk_register is None:
+                # Common case first: the report already exists. Project only
+                # its sections so the (much larger) register is never decoded
+                if not force_regenerate:
+                    existing = await self.db.questionnaires.find_one(
+                        {"questionnaire_id": questionnaire_id},
+                        {"audit_report.report_sections": 1, "status": 1, "_id": 0}
+                    )
+                    if existing is None:
+                        logger.error(f"Questionnaire {questionnaire_id} not found")
+                        return None
+                    sections = (existing.get("audit_report") or {}).get("report_sections")
+                    if sections:
+                        logger.info(f"Audit report already exists for questionnaire {questionnaire_id}")
+                        return AuditReportSections.model_construct(**sections)
+
+                # Fetch just what report generation needs - original_data in
+                # particular can be many KB and is never used here
+                document = await self.db.questionnaires.find_one(
+                    {"questionnaire_id": questionnaire_id},
+                    {
+                        "risk_register": 1,
+                        "risk_register_json": 1,
+                        "company_name": 1,
+                        "department": 1,
+                        "_id": 0,
+                    }
+                )
+
+                if not document:
+                    logger.error(f"Questionnaire {questionnaire_id} not found")
+                    return None
+
+                processed_questionnaire = hydrate_processed_questionnaire(document)
+
+                # Check if risk register is available
+                if not processed_questionnaire.risk_register:
+                    logger.error(f"Risk register not available for questionnaire {questionnaire_id}")
+                    return None
+
+                # Use stored company and department info from the questionnaire
+                stored_company = processed_questionnaire.company_name or company_name
+                stored_department = processed_questionnaire.department or department_name
+                risk_register = processed_questionnaire.risk_register
+            else:
+                stored_company = company_name
+                stored_department = department_name
+
+            # One pydantic-core pass producing canonical JSON - the old
+            # per-risk model_dump into repr(dict) walked the register twice
+            # and fed the LLM Python-literal syntax instead of JSON
+            risk_json = risk_register.model_dump_json()
+
             user_prompt = f"""Company: {stored_company}
 Department: {stored_department or 'Not specified'}
-Risk Register: {risk_data}"""
-            
-            # Generate report using LLM
-            logger.info(f"Generating audit report for questionnaire {questionnaire_id}")
-            report_sections = await self.llm_service.parse_response(
-                schema=AuditReportSections,
-                system_prompt=self.system_prompt,
-                user_prompt=user_prompt
-            )
+Risk Summary:
+{_summarize_register(risk_register)}
+Risk Register: {risk_json}"""
+
+            # Identical (prompt, company, department, register) inputs
+            # produce the same report - serve it from the content-addressed
+            # cache instead of paying seconds of LLM latency again
+            cache_key = hashlib.sha256(orjson.dumps(
+                [REPORT_SYSTEM_PROMPT, EXECUTIVE_SUMMARY_PROMPT, RISK_OVERVIEW_PROMPT,
+                 RECOMMENDATIONS_PROMPT, stored_company, stored_department, risk_json],
+                option=orjson.OPT_SORT_KEYS
+            )).hexdigest()
+
+            report_sections = None
+            if settings.report_cache_enabled:
+                cached = await self.db.report_cache.find_one({"_id": cache_key})
+                if cached:
+                    logger.info(f"Audit report cache hit for questionnaire {questionnaire_id}")
+                    report_sections = AuditReportSections.model_validate(cached["sections"])
+
+            if report_sections is None:
+                # Generate the three independent sections concurrently:
+                # wall-clock cost is the slowest round-trip, not the sum
+                logger.info(f"Generating audit report for questionnaire {questionnaire_id}")
+                summary, overview, recommendations = await self.llm_service.parse_batch([
+                    (AuditExecutiveSummary, EXECUTIVE_SUMMARY_PROMPT, user_prompt),
+                    (AuditRiskOverview, RISK_OVERVIEW_PROMPT, user_prompt),
+                    (AuditRecommendations, RECOMMENDATIONS_PROMPT, user_prompt),
+                ])
+                if summary and overview and recommendations:
+                    report_sections = AuditReportSections.model_construct(
+                        executive_summary=summary.executive_summary,
+                        risk_overview=overview.risk_overview,
+                        recommendations=recommendations.recommendations,
+                    )
+                else:
+                    # Single-shot fallback keeps the old one-call behavior
+                    # when any section generation fails
+                    logger.warning(f"Section generation incomplete for {questionnaire_id}, falling back to single-shot report")
+                    report_sections = await self.llm_service.parse_response(
+                        schema=AuditReportSections,
+                        system_prompt=REPORT_SYSTEM_PROMPT,
+                        user_prompt=user_prompt
+                    )
+                if report_sections and settings.report_cache_enabled:
+                    await self.db.report_cache.replace_one(
+                        {"_id": cache_key},
+                        {"sections": _fast_dump(report_sections), "created_at": utc_now()},
+                        upsert=True
+                    )
             
             if report_sections:
                 # Store the report in database using consistent data
                 await self._store_audit_report(
-                    questionnaire_id, 
-                    stored_company, 
-                    stored_department, 
+                    questionnaire_id,
+                    stored_company,
+                    stored_department,
                     report_sections
                 )
                 logger.info(f"Successfully generated audit report for questionnaire {questionnaire_id}")
@@ -102,24 +304,26 @@ Risk Register: {risk_data}"""
         """Store generated audit report in database"""
         
         try:
-            db = get_database()
             
             audit_report = AuditReport(
                 questionnaire_id=questionnaire_id,
                 company_name=company_name,
                 department_name=department_name,
                 report_sections=report_sections,
-                generated_at=datetime.now(timezone.utc),
+                generated_at=utc_now(),
                 status=QuestionnaireStatus.COMPLETED
             )
             
-            # Update the questionnaire document with the audit report
-            await db.questionnaires.update_one(
+            # Update the questionnaire document with the audit report,
+            # keeping generated_at a real BSON date
+            audit_doc = _fast_dump(audit_report)
+            audit_doc["generated_at"] = audit_report.generated_at
+            await self.db.questionnaires.update_one(
                 {"questionnaire_id": questionnaire_id},
                 {
                     "$set": {
-                        "audit_report": audit_report.model_dump(),
-                        "updated_at": datetime.now(timezone.utc)
+                        "audit_report": audit_doc,
+                        "updated_at": utc_now()
                     }
                 }
             )
@@ -134,33 +338,39 @@ Risk Register: {risk_data}"""
         """Retrieve existing audit report"""
         
         try:
-            db = get_database()
-            document = await db.questionnaires.find_one(
-                {"questionnaire_id": questionnaire_id}
+            document = await self.db.questionnaires.find_one(
+                {"questionnaire_id": questionnaire_id},
+                AUDIT_REPORT_PROJECTION
             )
-            
+
             if not document:
                 logger.warning(f"Questionnaire {questionnaire_id} not found")
                 return None
-            
-            processed_questionnaire = ProcessedQuestionnaire(**document)
-            
-            if processed_questionnaire.audit_report:
-                return processed_questionnaire.audit_report
+
+            if document.get("audit_report"):
+                return hydrate_audit_report(document["audit_report"])
             else:
                 logger.info(f"No audit report found for questionnaire {questionnaire_id}")
                 return None
-                
+
         except Exception as e:
             logger.error(f"Error retrieving audit report for {questionnaire_id}: {e}")
             return None
 
+    async def questionnaire_exists(self, questionnaire_id: str) -> bool:
+        """Check whether a questionnaire document exists (id-only projection)"""
+
+        document = await self.db.questionnaires.find_one(
+            {"questionnaire_id": questionnaire_id},
+            {"questionnaire_id": 1, "_id": 0}
+        )
+        return document is not None
+
     async def get_processed_questionnaire_with_report(self, questionnaire_id: str) -> Optional[ProcessedQuestionnaire]:
         """Get complete processed questionnaire including audit report"""
         
         try:
-            db = get_database()
-            document = await db.questionnaires.find_one(
+            document = await self.db.questionnaires.find_one(
                 {"questionnaire_id": questionnaire_id},
                 {"_id": 0}
             )
@@ -169,8 +379,12 @@ Risk Register: {risk_data}"""
                 logger.warning(f"Questionnaire {questionnaire_id} not found")
                 return None
             
-            return ProcessedQuestionnaire(**document)
+            return hydrate_processed_questionnaire(document)
             
         except Exception as e:
             logger.error(f"Error retrieving questionnaire with report for {questionnaire_id}: {e}")
             return None
+
+
+# Shared instance: one ReportService (and thus one LLM client pool) per process
+report_service = ReportService()
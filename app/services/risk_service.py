@@ -1,25 +1,46 @@
 import asyncio
 import logging
-import uuid
-from datetime import datetime, timezone
+import sys
+import time
+from functools import cached_property
 from typing import Optional
 
+from pymongo import ReturnDocument, WriteConcern
+from uuid6 import uuid7
+
 from app.models.schemas import (
-    ProcessedQuestionnaire, QuestionnaireStatus, RiskRegister, 
-    QuestionnaireRequest, RiskLLMInputRegister, Risk
+    ProcessedQuestionnaire, QuestionnaireStatus, RiskRegister,
+    QuestionnaireRequest, RiskLLMInputRegister, Risk, ReportResponse
 )
+from app.core.config import settings
+from app.core.utils import utc_now
 from app.services.llm_service import LLMService
 from app.database.mongodb import get_database
-from app.services.report_service import ReportService
+from app.database.redis_cache import cache_delete
+from app.services.report_service import (
+    hydrate_processed_questionnaire, inflate_risk_register, report_service
+)
 
 logger = logging.getLogger(__name__)
 
-class RiskAssessmentService:
-    """Service for processing risk assessments"""
-    
-    def __init__(self):
-        self.llm_service = LLMService()
-        self.system_prompt = """You are a risk assessment agent. 
+# Cap concurrent LLM pipelines at what the Omni server can actually absorb;
+# module-level so every service instance shares the same budget
+_llm_semaphore = asyncio.Semaphore(settings.llm_concurrency)
+
+# Strong references to in-flight processing tasks: the event loop only keeps
+# weak refs, so an unreferenced fire-and-forget task can be garbage-collected
+# mid-run and its exception silently dropped
+_background_tasks: set = set()
+
+
+def _on_processing_done(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error("Background processing task failed: %s", task.exception())
+
+# Invariant prompt built once at import: no per-call string allocation, and
+# a byte-identical prefix across calls
+RISK_SYSTEM_PROMPT = sys.intern("""You are a risk assessment agent. 
 You will be given Control Self-Assessment (CSA) questionnaire and interview answers.
 
 Your task is to generate a complete Risk Register, identifying the maximum number of distinct risks in JSON format following the schema below.
@@ -39,55 +60,91 @@ Rules:
 8. The goal is **maximum granularity and maximum number of risks** — prioritize separation over grouping.
 
 Return valid JSON that matches the schema exactly.
-"""
+""")
+
+class RiskAssessmentService:
+    """Service for processing risk assessments"""
+
+    def __init__(self):
+        self.llm_service = LLMService()
+
+    @cached_property
+    def db(self):
+        """Database handle, resolved on first use and then a plain attribute read"""
+        return get_database()
+
+    @cached_property
+    def bg_questionnaires(self):
+        """Questionnaires handle for background pipeline writes.
 
-    async def submit_questionnaire(
-        self, 
+        Progress state is re-derivable by reprocessing, so these writes wait
+        for the primary's acknowledgment but skip the journal fsync
+        (w=1, j=False). User-facing writes keep the default concern.
+        """
+        return self.db.questionnaires.with_options(
+            write_concern=WriteConcern(w=1, j=False)
+        )
+
+    async def create_record(
+        self,
         request: QuestionnaireRequest
     ) -> ProcessedQuestionnaire:
-        """Submit questionnaire and return initial response"""
-        
-        questionnaire_id = str(uuid.uuid4())
-        
-        # Create initial document in database
+        """Create the initial questionnaire document (fast, Mongo insert only)"""
+
+        # uuid7 is time-ordered: index inserts become sequential tail
+        # appends instead of random B-tree writes, and generation avoids a
+        # full urandom read per submission
+        questionnaire_id = str(uuid7())
+
         document = ProcessedQuestionnaire(
             questionnaire_id=questionnaire_id,
             original_data=request.questionnaire_data,
             status=QuestionnaireStatus.SUBMITTED,
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc),
+            created_at=utc_now(),
+            updated_at=utc_now(),
             company_name=request.company_name,
             department=request.department,
             submitted_by=request.submitted_by
         )
-        
-        # Save to database
-        db = get_database()
-        await db.questionnaires.insert_one(document.model_dump())
-        
-        # Start background processing
-        asyncio.create_task(self._process_questionnaire_async(questionnaire_id))
-        
+
+        await self.db.questionnaires.insert_one(document.model_dump())
+
         return document
 
+    async def process_record(self, questionnaire_id: str):
+        """Run the LLM pipeline for a questionnaire, bounded by the shared semaphore"""
+        async with _llm_semaphore:
+            await self._process_questionnaire_async(questionnaire_id)
+
+    def schedule_processing(self, questionnaire_id: str) -> None:
+        """Kick off the LLM pipeline without holding the caller.
+
+        The task is kept in a module-level registry until it finishes, and
+        its done-callback surfaces any exception that would otherwise vanish.
+        Concurrency is still bounded by the shared semaphore inside
+        process_record.
+        """
+        task = asyncio.create_task(self.process_record(questionnaire_id))
+        _background_tasks.add(task)
+        task.add_done_callback(_on_processing_done)
+
     async def _process_questionnaire_async(self, questionnaire_id: str):
         """Background task to process questionnaire with LLM and auto-generate audit report"""
-        db = get_database()
         
         try:
-            # Update status to in_progress
-            await db.questionnaires.update_one(
+            # Mark IN_PROGRESS and read the input fields in one atomic
+            # findAndModify instead of a write plus a follow-up read
+            document = await self.bg_questionnaires.find_one_and_update(
                 {"questionnaire_id": questionnaire_id},
                 {
                     "$set": {
                         "status": QuestionnaireStatus.IN_PROGRESS,
-                        "updated_at": datetime.now(timezone.utc)
+                        "updated_at": utc_now()
                     }
-                }
+                },
+                return_document=ReturnDocument.AFTER,
+                projection={"original_data": 1, "company_name": 1, "department": 1, "_id": 0}
             )
-            
-            # Get questionnaire data
-            document = await db.questionnaires.find_one({"questionnaire_id": questionnaire_id})
             if not document:
                 raise Exception("Questionnaire not found")
             
@@ -99,132 +156,181 @@ Return valid JSON that matches the schema exactly.
             logger.info(f"Processing questionnaire {questionnaire_id} with LLM")
             llm_risks = await self.llm_service.parse_response(
                 schema=RiskLLMInputRegister,
-                system_prompt=self.system_prompt,
+                system_prompt=RISK_SYSTEM_PROMPT,
                 user_prompt=questionnaire_data
             )
             if not llm_risks or not llm_risks.risks:
                 raise Exception("Failed to generate risks from LLM")
             
+            # The LLM output was already validated by parse_response and the
+            # generated references are trusted, so build the enriched risks
+            # with model_construct instead of dumping and re-validating every
+            # field through a second full Pydantic pass
             enriched_risks = []
             for idx, risk in enumerate(llm_risks.risks, start=1):
-                # Get the model data and update with generated references
-                risk_data = risk.model_dump()
-                risk_data.update({
+                enriched_risks.append(Risk.model_construct(**{
+                    **risk.__dict__,
                     "Risk_Event_Reference": f"Risk_{department}_{idx}",
                     "Control_Ref": f"Control_{department}_{idx}",
                     "Action_Plan_Reference": f"Action_{department}_{idx}",
                     "Risk_Data_Sources": ["CSA"],
-                })
-                enriched = Risk(**risk_data)
-                enriched_risks.append(enriched)
+                }))
 
-            risk_register = RiskRegister(risks=enriched_risks)
+            risk_register = RiskRegister.model_construct(risks=enriched_risks)
 
             if risk_register:
-                # Update with risk register
-                await db.questionnaires.update_one(
-                    {"questionnaire_id": questionnaire_id},
-                    {
-                        "$set": {
-                            "risk_register": risk_register.model_dump(),
-                            "processed_at": datetime.now(timezone.utc),
-                            "updated_at": datetime.now(timezone.utc)
-                        }
-                    }
-                )
-                logger.info(f"Successfully processed risk register for questionnaire {questionnaire_id}")
-                
-                # Auto-generate audit report using stored company and department info
-
-                report_service = ReportService()
-                
                 logger.info(f"Auto-generating audit report for questionnaire {questionnaire_id}")
-                
-                audit_report_sections = await report_service.generate_audit_report(
-                    questionnaire_id=questionnaire_id,
-                    company_name=company_name,
-                    department_name=department
-                )
-                
-                if audit_report_sections:
-                    logger.info(f"Successfully auto-generated audit report for questionnaire {questionnaire_id}")
-                    # Final status update to completed
-                    await db.questionnaires.update_one(
+
+                # The register write and the report generation are
+                # independent: the generator consumes the in-memory register
+                # (no re-read of the document we just wrote) while the write
+                # proceeds in parallel. return_exceptions lets both branches
+                # settle before we act - a plain gather would propagate a
+                # register-write failure while the audit task kept running
+                # and wrote state after the FAILED handler below
+                now = utc_now()
+                write_result, audit_report_sections = await asyncio.gather(
+                    self.bg_questionnaires.update_one(
                         {"questionnaire_id": questionnaire_id},
                         {
                             "$set": {
-                                "status": QuestionnaireStatus.COMPLETED,
-                                "updated_at": datetime.now(timezone.utc)
+                                "risk_register_json": risk_register.model_dump_json(),
+                                "processed_at": now,
+                                "updated_at": now
                             }
                         }
-                    )
+                    ),
+                    report_service.generate_audit_report(
+                        questionnaire_id=questionnaire_id,
+                        company_name=company_name,
+                        department_name=department,
+                        risk_register=risk_register
+                    ),
+                    return_exceptions=True
+                )
+                if isinstance(write_result, BaseException):
+                    raise write_result
+                if isinstance(audit_report_sections, BaseException):
+                    raise audit_report_sections
+                logger.info(f"Successfully processed risk register for questionnaire {questionnaire_id}")
+
+                if audit_report_sections:
+                    logger.info(f"Successfully auto-generated audit report for questionnaire {questionnaire_id}")
                 else:
                     logger.warning(f"Failed to auto-generate audit report for questionnaire {questionnaire_id}, but risk register is available")
-                    # Still mark as completed since risk register is ready
-                    await db.questionnaires.update_one(
-                        {"questionnaire_id": questionnaire_id},
-                        {
-                            "$set": {
-                                "status": QuestionnaireStatus.COMPLETED,
-                                "updated_at": datetime.now(timezone.utc)
-                            }
+
+                # The terminal status lands only after the register write has
+                # succeeded, so COMPLETED can never become visible (or
+                # cacheable) while risk_register is still null
+                await self.db.questionnaires.update_one(
+                    {"questionnaire_id": questionnaire_id},
+                    {
+                        "$set": {
+                            "status": QuestionnaireStatus.COMPLETED,
+                            "updated_at": utc_now()
                         }
-                    )
+                    }
+                )
             else:
                 raise Exception("Failed to generate risk register")
                 
         except Exception as e:
             logger.error(f"Error processing questionnaire {questionnaire_id}: {e}")
             # Update with error status
-            await db.questionnaires.update_one(
+            await self.db.questionnaires.update_one(
                 {"questionnaire_id": questionnaire_id},
                 {
                     "$set": {
                         "status": QuestionnaireStatus.FAILED,
                         "error_message": str(e),
-                        "updated_at": datetime.now(timezone.utc)
+                        "updated_at": utc_now()
                     }
                 }
             )
+        finally:
+            # Drop any response bodies cached while the document was changing
+            await cache_delete(
+                f"report:{questionnaire_id}",
+                f"audit_report:{questionnaire_id}"
+            )
+
+    async def get_status(self, questionnaire_id: str) -> Optional[dict]:
+        """Get only the status fields for a questionnaire (covering-index friendly)"""
+        try:
+            return await self.db.questionnaires.find_one(
+                {"questionnaire_id": questionnaire_id},
+                {
+                    "questionnaire_id": 1,
+                    "status": 1,
+                    "created_at": 1,
+                    "updated_at": 1,
+                    "processed_at": 1,
+                    "error_message": 1,
+                    "_id": 0,
+                }
+            )
+        except Exception as e:
+            logger.error(f"Error getting status for {questionnaire_id}: {e}")
+            raise
+
+    async def get_report_bundle(self, questionnaire_id: str) -> Optional[ReportResponse]:
+        """Get risk register + audit report + status in a single projected query.
+
+        Excludes the potentially huge original_data text so the report endpoint
+        only pulls the fields it actually renders.
+        """
+        try:
+            document = await self.db.questionnaires.find_one(
+                {"questionnaire_id": questionnaire_id},
+                {"_id": 0, "original_data": 0}
+            )
+
+            if not document:
+                logger.warning(f"No document found for questionnaire_id: {questionnaire_id}")
+                return None
+
+            return ReportResponse.model_validate(inflate_risk_register(document))
+
+        except Exception as e:
+            logger.error(f"Error getting report bundle for {questionnaire_id}: {e}")
+            raise
 
     async def get_report(self, questionnaire_id: str) -> Optional[ProcessedQuestionnaire]:
         """Get processed questionnaire report"""
-        start_time = datetime.now(timezone.utc)
-        logger.info(f"Getting report for questionnaire {questionnaire_id}")
-        
+        # Per-request timing instrumentation is debug-only: when the level is
+        # filtered the request pays neither the clock reads nor the formatting
+        debug_timing = logger.isEnabledFor(logging.DEBUG)
+        start_time = time.perf_counter() if debug_timing else 0.0
+
         try:
-            db = get_database()
-            logger.info(f"Database connection obtained in {(datetime.now(timezone.utc) - start_time).total_seconds():.3f}s")
-            
-            query_start = datetime.now(timezone.utc)
-            
-            # Add timeout protection to database query
-            try:
-                # Use projection to only get necessary fields for status checks
-                document = await asyncio.wait_for(
-                    db.questionnaires.find_one(
-                        {"questionnaire_id": questionnaire_id},
-                        {"_id": 0}  # Exclude MongoDB's internal _id field
-                    ),
-                    timeout=2.0  # 2 second timeout for DB queries
-                )
-            except asyncio.TimeoutError:
-                logger.error(f"Database query timeout for {questionnaire_id}")
-                raise Exception("Database query timeout")
-                
-            logger.info(f"Database query completed in {(datetime.now(timezone.utc) - query_start).total_seconds():.3f}s")
-            
+            # Status polls go through get_status (projected, index-backed), so
+            # this full fetch no longer needs the old 2s wait_for guard - the
+            # client's socket timeout bounds slow queries
+            document = await self.db.questionnaires.find_one(
+                {"questionnaire_id": questionnaire_id},
+                {"_id": 0}  # Exclude MongoDB's internal _id field
+            )
+
+            if debug_timing:
+                logger.debug("get_report query for %s took %.3fs",
+                             questionnaire_id, time.perf_counter() - start_time)
+
             if not document:
                 logger.warning(f"No document found for questionnaire_id: {questionnaire_id}")
                 return None
-            
-            result = ProcessedQuestionnaire(**document)
-            
-            total_time = (datetime.now(timezone.utc) - start_time).total_seconds()
-            logger.info(f"Total get_report time: {total_time:.3f}s")
-            
+
+            result = hydrate_processed_questionnaire(document)
+
+            if debug_timing:
+                logger.debug("get_report total for %s: %.3fs",
+                             questionnaire_id, time.perf_counter() - start_time)
+
             return result
             
         except Exception as e:
             logger.error(f"Error getting report for {questionnaire_id}: {e}")
             raise
+
+
+# Shared instance: constructed once per process
+risk_service = RiskAssessmentService()
@@ -1,18 +1,37 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
+import logging
+
+from pydantic_core import _pydantic_core
 
 from app.api.routes import questionnaire, reports
 from app.core.config import settings
 from app.database.mongodb import connect_to_mongo, close_mongo_connection
+from app.database.redis_cache import connect_to_redis, close_redis_connection
+from app.services.llm_service import LLMService
+
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    # Every request body and document passes through pydantic-core; the
+    # pure-Python fallback build silently costs 1.5-3x on validation
+    if not _pydantic_core.__file__.endswith((".so", ".pyd")):
+        logger.warning(
+            "pydantic-core is not the compiled build (%s) - validation will be slow",
+            _pydantic_core.__file__
+        )
     await connect_to_mongo()
+    await connect_to_redis()
     yield
     # Shutdown
+    await LLMService().aclose()
+    await close_redis_connection()
     await close_mongo_connection()
 
 
@@ -28,12 +47,17 @@ app = FastAPI(
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
+    allow_origins=[origin.strip() for origin in settings.cors_origins.split(",")],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization", "If-None-Match"],
+    expose_headers=["ETag"],
 )
 
+# Compress the large risk-register/report JSON payloads (~5-10x smaller);
+# small responses like health checks are left untouched
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Include routers
 app.include_router(questionnaire.router, prefix="/api/v1", tags=["questionnaire"])
 app.include_router(reports.router, prefix="/api/v1", tags=["reports"])
@@ -51,4 +75,13 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # uvloop/httptools replace the stdlib event loop and HTTP parser with
+    # C implementations - a 2-4x throughput win on this I/O-bound API
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=True,
+        loop="uvloop",
+        http="httptools",
+    )